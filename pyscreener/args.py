@@ -1,4 +1,5 @@
 from datetime import datetime
+import functools
 import json
 from typing import Optional
 
@@ -10,7 +11,29 @@ TIMESTAMP = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
 __version__ = _version.get_versions()['version']
 
+SCORE_MODES = ("best", "avg", "boltzmann", "top-k")
+
 def gen_args(argv: Optional[str] = None) -> Namespace:
+    parser = build_parser()
+
+    args = parser.parse_args(argv)
+    args.title_line = not args.no_title_line
+    del args.no_title_line
+
+    if args.output_dir is None:
+        args.output_dir = f'pyscreener_{datetime.now().strftime("%Y-%m-%d_%H-%M-%S")}'
+
+    args.metadata_template = dict(args.metadata_template)
+    args.metadata_template["buffer"] = args.buffer
+    args.metadata_template["docked_ligand_file"] = args.docked_ligand_file
+
+    return args
+
+
+@functools.lru_cache(maxsize=1)
+def build_parser() -> ArgumentParser:
+    """build the argument parser for pyscreener. The parser is cached, so it is only constructed
+    once no matter how many times arguments are parsed"""
     parser = ArgumentParser(
         description="Automate virtual screening of compound libraries."
     )
@@ -21,14 +44,7 @@ def gen_args(argv: Optional[str] = None) -> Namespace:
     add_screen_args(parser)
     add_postprocessing_args(parser)
 
-    args = parser.parse_args(argv)
-    args.title_line = not args.no_title_line
-    del args.no_title_line
-
-    args.metadata_template["buffer"] = args.buffer
-    args.metadata_template["docked_ligand_file"] = args.docked_ligand_file
-
-    return args
+    return parser
 
 
 def add_general_args(parser: ArgumentParser):
@@ -44,8 +60,7 @@ def add_general_args(parser: ArgumentParser):
     parser.add_argument(
         "-o",
         "--output-dir",
-        default=f'pyscreener_{datetime.now().strftime("%Y-%m-%d_%H-%M-%S")}',
-        help="the path of the output directory",
+        help="the path of the output directory. By default, a directory named with the current timestamp, 'pyscreener_<TIMESTAMP>'",
     )
     parser.add_argument(
         "--no-sort",
@@ -59,6 +74,10 @@ def add_general_args(parser: ArgumentParser):
         default=False,
         help="whether all prepared input files and generated output files should be collected to the final output directory. By default, these files are all stored in a node-local temporary directory that is inaccessible after program completion.",
     )
+    parser.add_argument(
+        "--tmp-dir",
+        help="the node-local directory under which to store the prepared input files and generated output files of each simulation. Setting this to a memory-backed filesystem (e.g., /dev/shm) avoids writing these files to disk. By default, the system temporary directory",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -174,36 +193,42 @@ def add_screen_args(parser: ArgumentParser):
         type=float,
         help="the amount of buffer space to add around the docked ligand when calculating the docking box",
     )
-    parser.add_argument("-nc", "--ncpu", default=1, type=int)
+    parser.add_argument(
+        "-nc",
+        "--ncpu",
+        default=1,
+        type=positive_int,
+        help="the number of cores to allocate to each docking calculation",
+    )
     parser.add_argument("--base-name", default="ligand")
     parser.add_argument(
         "--score-mode",
         default="best",
-        choices=("best", "avg", "boltzmann", "top-k"),
+        choices=SCORE_MODES,
         help="The method used to calculate the score of a single docking run on a single receptor",
     )
     parser.add_argument(
         "--repeat-score-mode",
         default="best",
-        choices=("best", "avg", "boltzmann", "top-k"),
+        choices=SCORE_MODES,
         help="The method used to calculate the overall score from repeated docking runs",
     )
     parser.add_argument(
         "--ensemble-score-mode",
         default="best",
-        choices=("best", "avg", "boltzmann", "top-k"),
+        choices=SCORE_MODES,
         help="The method used to calculate the overall score from an ensemble of docking runs",
     )
     parser.add_argument(
         "--repeats",
         default=1,
-        type=int,
+        type=positive_int,
         help="the number of times to repeat each docking run",
     )
     parser.add_argument(
         "-k",
         default=1,
-        type=int,
+        type=positive_int,
         help="the number of top scores to average if using a top-k score mode",
     )
 
@@ -70,8 +70,12 @@ class CalculationData:
     result: Optional[Result] = None
 
     def __post_init__(self):
-        self.in_path = Path(self.in_path)
-        self.out_path = Path(self.out_path)
+        # every planned simulation is built via `dataclasses.replace()` on a template whose paths
+        # are already Path objects, so only convert those that aren't
+        if not isinstance(self.in_path, Path):
+            self.in_path = Path(self.in_path)
+        if not isinstance(self.out_path, Path):
+            self.out_path = Path(self.out_path)
 
     @property
     def score(self) -> Optional[float]:
@@ -1,16 +1,15 @@
+import logging
 import os
 from pathlib import Path
 import re
 import subprocess as sp
-import sys
 from typing import Mapping, Optional, Tuple, Union
 
 from openbabel import pybel
 from rdkit.Chem import AllChem as Chem
-import ray
 
 from pyscreener.exceptions import MisconfiguredDirectoryError, MissingEnvironmentVariableError
-from pyscreener.utils import calc_score
+from pyscreener.utils import calc_score, get_node_id
 from pyscreener.docking import CalculationData, DockingRunner, Result
 from pyscreener.docking.dock import utils
 from pyscreener.docking.dock.metadata import DOCKMetadata
@@ -29,6 +28,10 @@ FLEX_DEFN_FILE = DOCK6 / "parameters" / "flex.defn"
 FLEX_DRIVE_FILE = DOCK6 / "parameters" / "flex_drive.tbl"
 DOCK = DOCK6 / "bin" / "dock6"
 
+logger = logging.getLogger(__name__)
+
+GRID_SCORE_PATTERN = re.compile(r"Grid_Score:?\s+(-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)")
+
 for f in (VDW_DEFN_FILE, FLEX_DEFN_FILE, FLEX_DRIVE_FILE, DOCK):
     if not f.exists():
         raise MisconfiguredDirectoryError(
@@ -166,8 +169,7 @@ class DOCKRunner(DockingRunner):
     def prepare_from_file(data: CalculationData) -> Optional[Tuple]:
         """Convert a single ligand to the appropriate input format with specified geometry"""
         fmt = Path(data.input_file).suffix.strip(".")
-        mols = list(pybel.readfile(fmt, data.input_file))
-        mol = mols[0]
+        mol = next(pybel.readfile(fmt, data.input_file))
 
         mol2 = Path(data.in_path) / f"{mol.title or data.name}.mol2"
         data.smi = mol.write()
@@ -204,18 +206,23 @@ class DOCKRunner(DockingRunner):
         logfile = Path(outfile_prefix).parent / f"{name}.log"
         argv = [str(DOCK), "-i", str(infile), "-o", str(logfile)]
 
-        ret = sp.run(argv, stdout=sp.PIPE, stderr=sp.PIPE)
+        # stdout is never read and the scores are parsed from the log file. close_fds=False lets
+        # the subprocess be spawned without scanning and closing every open fd in the worker
+        ret = sp.run(argv, stdout=sp.DEVNULL, stderr=sp.PIPE, close_fds=False)
         try:
             ret.check_returncode()
         except sp.SubprocessError:
-            print(f"ERROR: docking failed. argv: {argv}", file=sys.stderr)
-            print(f'Message: {ret.stderr.decode("utf-8")}', file=sys.stderr)
+            logger.error(
+                "docking failed. argv: %s Message: %s",
+                argv,
+                ret.stderr[-512:].decode("utf-8", errors="replace"),
+            )
 
         scores = DOCKRunner.parse_logfile(logfile)
         score = None if scores is None else calc_score(scores, data.score_mode, data.k)
 
         data.result = Result(
-            data.smi, name, re.sub("[:,.]", "", ray.state.current_node_id()), score
+            data.smi, name, get_node_id(), score
         )
 
         return scores
@@ -240,17 +247,11 @@ class DOCKRunner(DockingRunner):
             unparseable
         """
         try:
-            with open(outfile) as fid:
-                score_lines = [line for line in fid if "Grid_Score" in line]
+            data = Path(outfile).read_text()
         except OSError:
-            pass
+            return None
 
-        scores = []
-        for line in score_lines:
-            try:
-                scores.append(float(line.split()[1]))
-            except ValueError:
-                continue
+        scores = [float(score) for score in GRID_SCORE_PATTERN.findall(data)]
 
         return scores or None
 
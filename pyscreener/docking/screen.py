@@ -3,7 +3,6 @@ from dataclasses import replace
 from datetime import datetime
 from itertools import chain
 from pathlib import Path
-import re
 import shutil
 import tarfile
 import tempfile
@@ -13,7 +12,14 @@ import numpy as np
 import ray
 from tqdm import tqdm
 
-from pyscreener.utils import ScoreMode, autobox, pdbfix, reduce_scores, run_on_all_nodes
+from pyscreener.utils import (
+    ScoreMode,
+    autobox,
+    get_node_id,
+    pdbfix,
+    reduce_scores,
+    run_on_all_nodes,
+)
 from pyscreener.docking.data import CalculationData
 from pyscreener.docking.metadata import CalculationMetadata
 from pyscreener.docking.result import Result
@@ -40,6 +46,7 @@ class DockingVirtualScreen:
         repeats: int = 1,
         k: int = 1,
         verbose: int = 0,
+        tmp_dir: Optional[Union[str, Path]] = None,
     ):
         # super().__init__()
         self.runner = runner
@@ -91,7 +98,7 @@ class DockingVirtualScreen:
                 flush=True,
             )
 
-        self.tmp_dir = tempfile.gettempdir()
+        self.tmp_dir = tmp_dir or tempfile.gettempdir()
         self.prepare_and_run = ray.remote(num_cpus=ncpu)(self.runner.prepare_and_run)
 
         self.data_templates = [
@@ -120,8 +127,7 @@ class DockingVirtualScreen:
 
         self.data_templates = self.prepare_receptors()
 
-        self.planned_simulationsss = []
-        self.completed_simulationsss = []
+        self.resultsss = []
 
         self.num_ligands = 0
         self.total_simulations = 0
@@ -169,12 +175,16 @@ class DockingVirtualScreen:
         planned_simulationsss = self.plan(sources, smiles)
         completed_simulationsss = self.run(planned_simulationsss)
 
-        self.completed_simulationsss.extend(completed_simulationsss)
+        # only the results are retained: the completed simulations each carry a full copy of their
+        # inputs and metadata, which is redundant across all ligands docked against a receptor
+        resultsss = [
+            [[s.result for s in sims] for sims in simss]
+            for simss in completed_simulationsss
+        ]
+        self.resultsss.extend(resultsss)
+
         S = np.array(
-            [
-                [[s.result.score for s in sims] for sims in simss]
-                for simss in completed_simulationsss
-            ],
+            [[[r.score for r in results] for results in resultss] for resultss in resultsss],
             dtype=float,
         )
         self.num_ligands += len(S)
@@ -227,18 +237,16 @@ class DockingVirtualScreen:
 
     def all_results(self, flatten: bool = True) -> List[Result]:
         """A flattened list of results from all of the completed simulations"""
-        resultsss = [
-            [[s.result for s in sims] for sims in simss]
-            for simss in self.completed_simulationsss
-        ]
         if flatten:
-            return list(chain(*(chain(*resultsss))))
+            return list(chain(*(chain(*self.resultsss))))
 
-        return resultsss
+        return [[list(results) for results in resultss] for resultss in self.resultsss]
 
     def plan(
         self, sources: Iterable[str], smiles: bool = True
     ) -> List[List[List[CalculationData]]]:
+        offset = len(self)
+
         if smiles:
             planned_simulationsss = [
                 [
@@ -246,7 +254,7 @@ class DockingVirtualScreen:
                         replace(
                             data_template,
                             smi=smi,
-                            name=f"{self.base_name}_{i+len(self)}_{j}",
+                            name=f"{self.base_name}_{i+offset}_{j}",
                         )
                         for j in range(self.repeats)
                     ]
@@ -261,7 +269,7 @@ class DockingVirtualScreen:
                         replace(
                             data_template,
                             input_file=filepath,
-                            name=f"{self.base_name}_{i+len(self)}_{j}",
+                            name=f"{self.base_name}_{i+offset}_{j}",
                         )
                         for j in range(self.repeats)
                     ]
@@ -312,7 +320,7 @@ class DockingVirtualScreen:
         out_path = Path(path or self.path)
         out_path.mkdir(parents=True, exist_ok=True)
 
-        output_id = re.sub(r"[:,.]", "", ray.state.current_node_id())
+        output_id = get_node_id()
         tmp_tar = (self.tmp_dir / output_id).with_suffix(".tar.gz")
 
         with tarfile.open(tmp_tar, "w:gz") as tar:
@@ -30,6 +30,8 @@ class VinaMetadata(CalculationMetadata):
         the maximum energy difference (in kcal/mol) between the best and worst output binding modes
     extra : List[str]
         additional arguments that will be passed to the docking calculation
+    use_bindings : bool
+        whether to dock with the AutoDock Vina python bindings rather than the vina executable
     prepared_ligand: Optional[Path]
     prepared_receptor: Optional[Path]
 
@@ -49,6 +51,10 @@ class VinaMetadata(CalculationMetadata):
     extra : str, default=""
         a string containing the additional command line arguments to pass to a run of a vina-type
         software for options not contained within the default metadata. E.g. for a run of Smina, extra="--force_cap ARG" or for PSOVina, extra="-w ARG"
+    use_bindings : bool, default=False
+        whether to dock with the AutoDock Vina python bindings (the `vina` package) rather than
+        the vina executable, avoiding a process spawn for every ligand. Only applies to
+        software="vina" with no extra arguments, and no log file is written for these runs
     prepared_ligand: Optional[Union[str, Path]] = None,
     prepared_receptor: Optional[Union[str, Path]] = None
     """
@@ -58,6 +64,7 @@ class VinaMetadata(CalculationMetadata):
     num_modes: int = 9
     energy_range: float = 3.
     extra: Union[str, Iterable[str]] = ""
+    use_bindings: bool = False
     prepared_ligand: Optional[Union[str, Path]] = None
     prepared_receptor: Optional[Union[str, Path]] = None
 
@@ -71,3 +78,7 @@ class VinaMetadata(CalculationMetadata):
                 )
 
         self.extra = shlex.split(self.extra) if isinstance(self.extra, str) else self.extra
+        if isinstance(self.prepared_ligand, str):
+            self.prepared_ligand = Path(self.prepared_ligand)
+        if isinstance(self.prepared_receptor, str):
+            self.prepared_receptor = Path(self.prepared_receptor)
@@ -1,14 +1,19 @@
-from itertools import takewhile
+import functools
+import logging
 from pathlib import Path
+import random
 import re
 import shutil
 import subprocess as sp
-import sys
 from typing import List, Optional, Tuple, Union
 
-from openbabel import pybel
+from openbabel import openbabel as ob, pybel
 from rdkit.Chem import AllChem as Chem
-import ray
+
+try:
+    from vina import Vina
+except ImportError:
+    Vina = None
 
 from pyscreener import utils
 from pyscreener.exceptions import MissingExecutableError
@@ -18,11 +23,34 @@ from pyscreener.docking.result import Result
 from pyscreener.docking.vina.metadata import VinaMetadata
 from pyscreener.docking.vina.utils import Software
 
-if shutil.which("prepare_receptor") is None:
-    raise MissingExecutableError(
-        'Could not find "prepare_receptor" on PATH! '
-        "See https://github.com/coleygroup/pyscreener#adding-an-executable-to-your-path for more information."
-    )
+logger = logging.getLogger(__name__)
+
+TABLE_BORDER = "-----+------------+----------+----------"
+SCORE_PATTERN = re.compile(r"^[ \t]*\d+[ \t]+(-?\d+(?:\.\d+)?)", re.M)
+
+# reused across ligands prepared in the same process rather than constructed for each one
+MOL_TO_PDBQT = ob.OBConversion()
+MOL_TO_PDBQT.SetInAndOutFormats("mol", "pdbqt")
+MOL_TO_PDBQT.AddOption("h", ob.OBConversion.OUTOPTIONS)
+GASTEIGER = ob.OBChargeModel.FindType("gasteiger")
+
+# vina takes the seed as a C int and draws a random one itself when given 0
+MAX_SEED = 2 ** 31 - 1
+
+ARGV_PREFIX_TEMPLATE = (
+    "{software}",
+    "--receptor={receptor}",
+    "--center_x={center[0]}",
+    "--center_y={center[1]}",
+    "--center_z={center[2]}",
+    "--size_x={size[0]}",
+    "--size_y={size[1]}",
+    "--size_z={size[2]}",
+    "--cpu={ncpu}",
+    "--exhaustiveness={exhaustiveness}",
+    "--num_modes={num_modes}",
+    "--energy_range={energy_range}",
+)
 
 
 class VinaRunner(DockingRunner):
@@ -47,16 +75,18 @@ class VinaRunner(DockingRunner):
         receptor_pdbqt : Optional[str]
             the filepath of the resulting PDBQT file. None if preparation failed
         """
-        name = Path(data.receptor).with_suffix(".pdbqt").name
-        receptor_pdbqt = Path(data.in_path) / name
+        receptor_pdbqt = data.in_path / f"{Path(data.receptor).stem}.pdbqt"
 
-        argv = ["prepare_receptor", "-r", data.receptor, "-o", receptor_pdbqt]
+        argv = ["prepare_receptor", "-r", str(data.receptor), "-o", str(receptor_pdbqt)]
         try:
             ret = sp.run(argv, stderr=sp.PIPE)
             ret.check_returncode()
         except sp.SubprocessError:
-            print(f'ERROR: failed to convert "{data.receptor}"', file=sys.stderr)
-            print(ret.stderr.decode("utf-8"))
+            logger.error(
+                'failed to convert "%s". Message: %s',
+                data.receptor,
+                ret.stderr[-512:].decode("utf-8", errors="replace"),
+            )
             return None
 
         data.metadata.prepared_receptor = receptor_pdbqt
@@ -89,6 +119,7 @@ class VinaRunner(DockingRunner):
         Returns
         -------
         CalculationData
+            the data with its `prepared_ligand` set. None if the ligand couldn't be read
         """
         pdbqt = Path(data.in_path) / f"{data.name}.pdbqt"
 
@@ -96,15 +127,19 @@ class VinaRunner(DockingRunner):
         Chem.EmbedMolecule(mol)
         Chem.MMFFOptimizeMolecule(mol)
 
-        try:
-            mol = pybel.readstring("mol", Chem.MolToMolBlock(mol))
-            # mol.make3D()
-            # mol.addh()
-            mol.calccharges(model="gasteiger")
-        except Exception:
-            pass
+        obmol = ob.OBMol()
+        if not MOL_TO_PDBQT.ReadString(obmol, Chem.MolToMolBlock(mol)):
+            logger.error('failed to prepare ligand "%s" from SMILES "%s"', data.name, data.smi)
+            # metadata is shared between copies of a template, so clear any ligand prepared before
+            data.metadata.prepared_ligand = None
+            return data
 
-        mol.write("pdbqt", str(pdbqt), overwrite=True, opt={"h": None})
+        if GASTEIGER is None or not GASTEIGER.ComputeCharges(obmol):
+            logger.warning('failed to compute Gasteiger charges for ligand "%s"', data.name)
+
+        MOL_TO_PDBQT.SetOutputIndex(0)
+        MOL_TO_PDBQT.WriteFile(obmol, str(pdbqt))
+        MOL_TO_PDBQT.CloseOutFile()
         data.metadata.prepared_ligand = pdbqt
 
         return data
@@ -123,8 +158,7 @@ class VinaRunner(DockingRunner):
         CalculationData
         """
         fmt = Path(data.input_file).suffix.strip(".")
-        mols = list(pybel.readfile(fmt, data.input_file))
-        mol = mols[0]
+        mol = next(pybel.readfile(fmt, data.input_file))
 
         pdbqt = Path(data.in_path) / f"{mol.title or data.name}.pdbqt"
         data.smi = mol.write()
@@ -147,46 +181,156 @@ class VinaRunner(DockingRunner):
         Returns
         -------
         scores : Optional[List[float]]
-            the conformer scores parsed from the log file
+            the conformer scores parsed from the log file or, if docking through the Vina python
+            bindings, returned by the bindings
         """
-        p_ligand = Path(data.metadata.prepared_ligand)
-        ligand_name = p_ligand.stem
-
-        name = f"{Path(data.receptor).stem}_{ligand_name}"
-
-        argv, out, log = VinaRunner.build_argv(
-            ligand=data.metadata.prepared_ligand,
-            receptor=data.metadata.prepared_receptor,
-            software=data.metadata.software,
-            center=data.center,
-            size=data.size,
-            ncpu=data.ncpu,
-            exhaustiveness=data.metadata.exhaustiveness,
-            num_modes=data.metadata.num_modes,
-            energy_range=data.metadata.energy_range,
-            name=name,
-            path=Path(data.out_path),
-            extra=data.metadata.extra,
-        )
+        if data.metadata.prepared_ligand is None:
+            name = f"{data.metadata.prepared_receptor.stem}_{data.name}"
+            data.result = Result(data.smi, name, utils.get_node_id(), None)
+            return None
 
-        ret = sp.run(argv, stdout=sp.PIPE, stderr=sp.PIPE)
-        try:
-            ret.check_returncode()
-        except sp.SubprocessError:
-            print(f'ERROR: docking failed. Message: {ret.stderr.decode("utf-8")}', file=sys.stderr)
+        name = f"{data.metadata.prepared_receptor.stem}_{data.metadata.prepared_ligand.stem}"
+
+        if VinaRunner.can_run_in_process(data.metadata):
+            scores = VinaRunner.run_in_process(
+                ligand=data.metadata.prepared_ligand,
+                receptor=data.metadata.prepared_receptor,
+                center=data.center,
+                size=data.size,
+                ncpu=data.ncpu,
+                exhaustiveness=data.metadata.exhaustiveness,
+                num_modes=data.metadata.num_modes,
+                energy_range=data.metadata.energy_range,
+                name=name,
+                path=data.out_path,
+            )
+        else:
+            argv, out, log = VinaRunner.build_argv(
+                ligand=data.metadata.prepared_ligand,
+                receptor=data.metadata.prepared_receptor,
+                software=data.metadata.software,
+                center=data.center,
+                size=data.size,
+                ncpu=data.ncpu,
+                exhaustiveness=data.metadata.exhaustiveness,
+                num_modes=data.metadata.num_modes,
+                energy_range=data.metadata.energy_range,
+                name=name,
+                path=data.out_path,
+                extra=data.metadata.extra,
+            )
+
+            # stdout is never read and the scores are parsed from the log file. close_fds=False lets
+            # the subprocess be spawned without scanning and closing every open fd in the worker
+            ret = sp.run(argv, stdout=sp.DEVNULL, stderr=sp.PIPE, close_fds=False)
+            try:
+                ret.check_returncode()
+            except sp.SubprocessError:
+                logger.error(
+                    "docking failed. argv: %s Message: %s",
+                    argv,
+                    ret.stderr[-512:].decode("utf-8", errors="replace"),
+                )
+
+            scores = VinaRunner.parse_logfile(log)
 
-        scores = VinaRunner.parse_logfile(log)
         if scores is None:
             score = None
         else:
             score = utils.calc_score(scores, data.score_mode, data.k)
 
         data.result = Result(
-            data.smi, name, re.sub("[:,.]", "", ray.state.current_node_id()), score
+            data.smi, name, utils.get_node_id(), score
         )
 
         return scores
 
+    @staticmethod
+    def can_run_in_process(metadata: VinaMetadata) -> bool:
+        """whether the simulation should be run through the Vina python bindings rather than a
+        subprocess. The bindings must be requested via `metadata.use_bindings`, only AutoDock Vina
+        itself has python bindings, and any extra command line arguments can only be passed to the
+        executable"""
+        return (
+            metadata.use_bindings
+            and Vina is not None
+            and metadata.software == Software.VINA
+            and not metadata.extra
+        )
+
+    @staticmethod
+    def run_in_process(
+        ligand: Union[str, Path],
+        receptor: Union[str, Path],
+        center: Tuple[float, float, float],
+        size: Tuple[float, float, float] = (10, 10, 10),
+        ncpu: int = 1,
+        exhaustiveness: int = 8,
+        num_modes: int = 9,
+        energy_range: float = 3.,
+        name: Optional[str] = None,
+        path: Path = Path("."),
+    ) -> Optional[List[float]]:
+        """Dock the given ligand using the AutoDock Vina python bindings. A new `Vina` object is
+        built for every call, as each one fixes its random seed at construction
+
+        Parameters
+        ----------
+        ligand : Union[str, Path]
+            the filename of the input ligand PDBQT file
+        receptor : Union[str, Path]
+            the filename of the input receptor PDBQT file
+        center : Tuple[float, float, float]
+            the x-, y-, and z-coordinates of the center of the search box
+        size : Tuple[float, float, float], default=(10, 10, 10)
+            the  x-, y-, and z-radii, respectively, of the search box
+        ncpu : int, default=1
+            the number of cores to allocate to the docking calculation
+        exhaustiveness: int
+            the exhaustiveness of the global search. Larger values are more exhaustive
+        num_modes: int
+            the number of output modes
+        energy_range: float
+            the maximum energy difference (in kcal/mol) between the best and worst output binding 
+            modes
+        name : string, default=<receptor>_<ligand>)
+            the base name to use for the out file
+        path : Path, default=Path('.')
+            the path under which the out file should be written
+
+        Returns
+        -------
+        Optional[List[float]]
+            the scores of the docked binding modes. None if docking failed
+        """
+        name = name or (Path(receptor).stem + "_" + Path(ligand).stem)
+        out = path / f"{Software.VINA.value}_{name}_out.pdbqt"
+
+        # vina exits the whole process rather than raising on an empty ligand, which would take
+        # down the worker, so catch that case here
+        try:
+            if Path(ligand).stat().st_size == 0:
+                logger.error('docking failed. Ligand file "%s" is empty', ligand)
+                return None
+        except OSError as e:
+            logger.error("docking failed. Message: %s", e)
+            return None
+
+        try:
+            seed = random.randint(1, MAX_SEED)
+            v = Vina(sf_name="vina", cpu=max(ncpu, 0), seed=seed, verbosity=0)
+            v.set_receptor(str(receptor))
+            v.compute_vina_maps(center=list(center), box_size=list(size))
+            v.set_ligand_from_file(str(ligand))
+            v.dock(exhaustiveness=exhaustiveness, n_poses=num_modes)
+            v.write_poses(str(out), n_poses=num_modes, energy_range=energy_range, overwrite=True)
+            energies = v.energies(n_poses=num_modes, energy_range=energy_range)
+        except Exception as e:
+            logger.error("docking failed. Message: %s", e)
+            return None
+
+        return energies[:, 0].tolist() or None
+
     @staticmethod
     def build_argv(
         ligand: str,
@@ -247,30 +391,61 @@ class VinaRunner(DockingRunner):
         name = name or (Path(receptor).stem + "_" + Path(ligand).stem)
         extra = extra or []
 
-        out = path / f"{software.value}_{name}_out.pdbqt"
-        log = path / f"{software.value}_{name}.log"
-
-        argv = [
-            software.value,
-            f"--receptor={receptor}",
-            f"--ligand={ligand}",
-            f"--center_x={center[0]}",
-            f"--center_y={center[1]}",
-            f"--center_z={center[2]}",
-            f"--size_x={size[0]}",
-            f"--size_y={size[1]}",
-            f"--size_z={size[2]}",
-            f"--cpu={ncpu}",
-            f"--out={out}",
-            f"--log={log}",
-            f"--exhaustiveness={exhaustiveness}",
-            f"--num_modes={num_modes}",
-            f"--energy_range={energy_range}",
-            *extra,
-        ]
+        software_name = software.value
+        out = path / f"{software_name}_{name}_out.pdbqt"
+        log = path / f"{software_name}_{name}.log"
+
+        prefix = VinaRunner.make_arg_prefix(
+            str(receptor),
+            software,
+            tuple(center),
+            tuple(size),
+            ncpu,
+            exhaustiveness,
+            num_modes,
+            energy_range,
+            tuple(extra),
+        )
+        argv = [*prefix, f"--ligand={ligand}", f"--out={out}", f"--log={log}"]
 
         return argv, out, log
 
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def make_arg_prefix(
+        receptor: str,
+        software: Software,
+        center: Tuple[float, float, float],
+        size: Tuple[float, float, float] = (10, 10, 10),
+        ncpu: int = 1,
+        exhaustiveness: int = 8,
+        num_modes: int = 9,
+        energy_range: float = 3.,
+        extra: Tuple[str, ...] = (),
+    ) -> Tuple[str, ...]:
+        """Build the portion of the argument vector that is shared by every ligand docked against
+        the given receptor with the given parameters. Cached, so it is only built once per
+        receptor and parameter set in a given process. See `build_argv` for a description of
+        the parameters
+
+        Returns
+        -------
+        Tuple[str, ...]
+            the ligand-independent portion of the argument vector
+        """
+        fields = dict(
+            software=software.value,
+            receptor=receptor,
+            center=center,
+            size=size,
+            ncpu=ncpu,
+            exhaustiveness=exhaustiveness,
+            num_modes=num_modes,
+            energy_range=energy_range,
+        )
+
+        return (*(arg.format_map(fields) for arg in ARGV_PREFIX_TEMPLATE), *extra)
+
     @staticmethod
     def parse_logfile(logfile: Union[str, Path]) -> Optional[List[float]]:
         """parse a Vina-type log file for the scores of the binding modes
@@ -286,23 +461,19 @@ class VinaRunner(DockingRunner):
             the scores of the docked binding modes in the ordering of the log file. None if no 
             scores were parsed or the log file was unparseable
         """
-        TABLE_BORDER = "-----+------------+----------+----------"
         try:
-            with open(logfile) as fid:
-                for line in fid:
-                    if TABLE_BORDER in line:
-                        break
-
-                score_lines = list(takewhile(lambda line: "Writing" not in line, fid))
+            data = Path(logfile).read_text()
         except OSError:
             return None
 
-        scores = []
-        for line in score_lines:
-            try:
-                scores.append(float(line.split()[1]))
-            except ValueError:
-                continue
+        start = data.find(TABLE_BORDER)
+        if start == -1:
+            return None
+
+        end = data.find("Writing", start)
+        end = end if end != -1 else len(data)
+
+        scores = [float(score) for score in SCORE_PATTERN.findall(data, start, end)]
 
         return scores or None
 
@@ -322,15 +493,22 @@ class VinaRunner(DockingRunner):
             parsed or the log file was unparseable
         """
         try:
-            with open(outfile) as fid:
-                score_lines = [line for line in fid.readlines() if 'REMARK VINA RESULT' in line]
+            with open(outfile, "rb") as fid:
+                buf = fid.read()
         except OSError:
             return None
 
         scores = []
-        for line in score_lines:
+        for line in buf.splitlines():
+            if b"REMARK VINA RESULT" not in line:
+                continue
+
+            fields = line.split(None, 4)
+            if len(fields) < 4:
+                continue
+
             try:
-                scores.append(float(line.split()[3]))
+                scores.append(float(fields[3]))
             except ValueError:
                 continue
 
@@ -338,6 +516,19 @@ class VinaRunner(DockingRunner):
 
     @staticmethod
     def validate_metadata(metadata: VinaMetadata):
+        if shutil.which("prepare_receptor") is None:
+            raise MissingExecutableError(
+                'Could not find "prepare_receptor" on PATH! '
+                "See https://github.com/coleygroup/pyscreener#adding-an-executable-to-your-path for more information."
+            )
+        if metadata.use_bindings and Vina is None:
+            raise MissingExecutableError(
+                'Could not import the AutoDock Vina python bindings, but "use_bindings" was '
+                'specified! Install the "vina" package or set "use_bindings" to false.'
+            )
+        if VinaRunner.can_run_in_process(metadata):
+            return
+
         if shutil.which(metadata.software.value) is None:
             raise MissingExecutableError(
                 f'Could not find "{metadata.software.value}" on PATH! '
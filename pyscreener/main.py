@@ -77,6 +77,7 @@ def main():
         args.repeats,
         args.k,
         args.verbose,
+        args.tmp_dir,
     )
     supply = ps.LigandSupply(
         args.input_files,
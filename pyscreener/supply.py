@@ -2,13 +2,29 @@ from __future__ import annotations
 
 import csv
 from collections.abc import Iterable
+from math import ceil
 from pathlib import Path
 from typing import Optional, Union
 
-from openbabel import pybel
+from openbabel import openbabel as ob, pybel
+import ray
 from rdkit.Chem import AllChem as Chem
 
-from pyscreener.utils import FileFormat
+from pyscreener.utils import FileFormat, chunks
+
+
+def _optimize_and_write(smis_names: Iterable[tuple[str, str]], filenames: Iterable[str]):
+    """optimize the geometry of each molecule and write it to the corresponding MOL file, titled
+    with the molecule's name"""
+    for (smi, name), filename in zip(smis_names, filenames):
+        mol = Chem.AddHs(Chem.MolFromSmiles(smi))
+        mol.SetProp("_Name", name)
+        Chem.EmbedMolecule(mol)
+        Chem.MMFFOptimizeMolecule(mol)
+        Chem.MolToMolFile(mol, filename)
+
+
+_optimize_and_write_remote = ray.remote(_optimize_and_write)
 
 
 class LigandSupply(Iterable):
@@ -194,11 +210,10 @@ class LigandSupply(Iterable):
 
         fmt = Path(filepath).suffix.strip(".")
 
-        mols = list(pybel.readfile(fmt, filepath))
-        smis = [mol.write() for mol in mols]
+        smis = [mol.write() for mol in pybel.readfile(fmt, str(filepath))]
 
         if not optimize:
-            return [mol.write() for mol in mols]
+            return smis
 
         mols = [Chem.MolFromSmiles(smi) for smi in smis]
 
@@ -241,13 +256,27 @@ class LigandSupply(Iterable):
         mols: Iterable[Chem.Mol], filepath: Path, path: Optional[Path] = None
     ) -> list[str]:
         base_name = (path or filepath.parent) / filepath.stem
-        # NOTE(degraff): this can parallelized later
-        mols = [Chem.AddHs(mol) for mol in mols]
-        [Chem.EmbedMolecule(mol) for mol in mols]
-        [Chem.MMFFOptimizeMolecule(mol) for mol in mols]
 
-        filenames = [f"{base_name}_{i}.mol" for i in range(len(mols))]
-        [Chem.MolToMolFile(mol, filename) for mol, filename in zip(mols, filenames)]
+        # RDKit Mols lose their properties (e.g., their title) when pickled, so send each molecule
+        # as its SMILES string and title instead and rebuild it in the worker
+        smis_names = [
+            (Chem.MolToSmiles(mol), mol.GetProp("_Name") if mol.HasProp("_Name") else "")
+            for mol in mols
+        ]
+        filenames = [f"{base_name}_{i}.mol" for i in range(len(smis_names))]
+
+        if not ray.is_initialized():
+            _optimize_and_write(smis_names, filenames)
+            return filenames
+
+        chunksize = max(1, ceil(len(smis_names) / ray.cluster_resources().get("CPU", 1)))
+        refs = [
+            _optimize_and_write_remote.remote(smis_names_chunk, filenames_chunk)
+            for smis_names_chunk, filenames_chunk in zip(
+                chunks(smis_names, chunksize), chunks(filenames, chunksize)
+            )
+        ]
+        ray.get(refs)
 
         return filenames
 
@@ -256,10 +285,19 @@ class LigandSupply(Iterable):
         fmt = filepath.suffix.strip(".")
         base_name = (path or filepath.parent) / filepath.stem
 
-        mols = list(pybel.readfile(fmt, str(filepath)))
-
-        filenames = [f"{base_name}_{i}.{fmt}" for i in range(len(mols))]
-        [mol.write(fmt, filename, True) for mol, filename in zip(mols, filenames)]
+        conv = ob.OBConversion()
+        if not conv.SetOutFormat(fmt):
+            raise ValueError(f'"{fmt}" is not a recognised Open Babel format')
+
+        filenames = []
+        for i, mol in enumerate(pybel.readfile(fmt, str(filepath))):
+            filename = f"{base_name}_{i}.{fmt}"
+            conv.SetOutputIndex(0)
+            success = conv.WriteFile(mol.OBMol, filename)
+            conv.CloseOutFile()
+            if not success:
+                raise ValueError(f'Failed to write molecule {i} of "{filepath}" to "{filename}"')
+            filenames.append(filename)
 
         return filenames
 
@@ -6,6 +6,7 @@ __all__ = [
     "calc_score",
     "reduce_scores",
     "run_on_all_nodes",
+    "get_node_id",
 ]
 
 from enum import Enum, auto
@@ -17,6 +18,8 @@ import warnings
 import numpy as np
 import ray
 
+NODE_ID_TRANS = str.maketrans("", "", ":,.")
+
 
 class AutoName(Enum):
     def _generate_next_value_(name, start, count, last_values):
@@ -166,3 +169,10 @@ def run_on_all_nodes(func: Callable) -> Callable:
         return ray.get(refs[-1])
 
     return wrapper_run_on_all_nodes
+
+
+@functools.lru_cache(maxsize=1)
+def get_node_id() -> str:
+    """the ID of the ray node on which this process is running with all ':', ',', and '.'
+    characters removed. Cached because the node of a process never changes during its lifetime"""
+    return ray.state.current_node_id().translate(NODE_ID_TRANS)
@@ -2,6 +2,7 @@ import csv
 from pathlib import Path
 
 import pytest
+import ray
 from rdkit import Chem
 
 from pyscreener.supply import LigandSupply
@@ -109,6 +110,23 @@ def test_optimize(smis, tmp_path, filetype):
         assert Path(ligand).exists()
 
 
+def test_optimize_ray_keeps_titles(smis, tmp_path):
+    p_sdf = tmp_path / "mols.sdf"
+    names = [f"mol_{i}" for i in range(len(smis))]
+    with Chem.SDWriter(str(p_sdf)) as w:
+        for m, name in zip(mols(smis), names):
+            m.SetProp("_Name", name)
+            w.write(m)
+
+    ray.init(num_cpus=2)
+    try:
+        supply = LigandSupply([p_sdf], optimize=True, path=tmp_path)
+    finally:
+        ray.shutdown()
+
+    assert [Chem.MolFromMolFile(ligand).GetProp("_Name") for ligand in supply] == names
+
+
 def test_multiple_filetypes(smis, tmp_path):
     filepaths = [
         make_csv(smis, tmp_path),
@@ -1,14 +1,17 @@
 from pathlib import Path
+import shutil
 
+import numpy as np
 import pytest
 
 from pyscreener.exceptions import MissingExecutableError, NotSimulatedError
 from pyscreener.utils import calc_score
+from pyscreener.docking import CalculationData, vina
 
-try:
-    from pyscreener.docking import CalculationData, vina
-except MissingExecutableError:
-    pytestmark = pytest.mark.skip()
+requires_prepare_receptor = pytest.mark.skipif(
+    shutil.which("prepare_receptor") is None, reason='"prepare_receptor" is not on PATH'
+)
+requires_vina = pytest.mark.skipif(shutil.which("vina") is None, reason='"vina" is not on PATH')
 
 TEST_DIR = Path(__file__).parent
 RECEPTOR_FILEPATH = TEST_DIR / "5WIU.pdb"
@@ -72,6 +75,7 @@ def test_prepare_ligand(data):
     assert data.metadata.prepared_ligand.exists()
 
 
+@requires_prepare_receptor
 def test_prepare(receptor, center, size, in_path, out_path):
     data = CalculationData(
         "c1ccccc1",
@@ -91,6 +95,8 @@ def test_prepare(receptor, center, size, in_path, out_path):
     assert data.metadata.prepared_ligand.exists()
 
 
+@requires_prepare_receptor
+@requires_vina
 def test_run(data):
     vina.VinaRunner.prepare(data)
 
@@ -100,3 +106,130 @@ def test_run(data):
     scores = vina.VinaRunner.run(data)
 
     assert data.score == calc_score(scores, data.score_mode, data.k)
+
+
+def test_parse_logfile(tmp_path):
+    logfile = tmp_path / "vina.log"
+    logfile.write_text(
+        "Detected 8 CPUs\n"
+        "0%   10   20   30   40   50   60   70   80   90   100%\n"
+        "|----|----|----|----|----|----|----|----|----|----|\n"
+        "***************************************************\n"
+        "mode |   affinity | dist from best mode\n"
+        "     | (kcal/mol) | rmsd l.b.| rmsd u.b.\n"
+        "-----+------------+----------+----------\n"
+        "   1         -7.2      0.000      0.000\n"
+        "   2         -6.9      1.974      2.861\n"
+        "   3         -6.5      2.117      6.324\n"
+        "Writing output ... done.\n"
+    )
+
+    assert vina.VinaRunner.parse_logfile(logfile) == [-7.2, -6.9, -6.5]
+
+
+def test_parse_logfile_vina_1_2(tmp_path):
+    logfile = tmp_path / "vina.log"
+    logfile.write_text(
+        "mode |   affinity | dist from best mode\n"
+        "     | (kcal/mol) | rmsd l.b.| rmsd u.b.\n"
+        "-----+------------+----------+----------\n"
+        "   1          -10          0          0\n"
+        "   2       -9.517      1.974      2.861\n"
+        "   3           -9      2.117      6.324\n"
+    )
+
+    assert vina.VinaRunner.parse_logfile(logfile) == [-10.0, -9.517, -9.0]
+
+
+def test_parse_logfile_split_row(tmp_path):
+    logfile = tmp_path / "vina.log"
+    logfile.write_text(
+        "-----+------------+----------+----------\n"
+        "   1\n"
+        "   2         -6.9      1.974      2.861\n"
+        "Writing output ... done.\n"
+    )
+
+    assert vina.VinaRunner.parse_logfile(logfile) == [-6.9]
+
+
+def test_parse_logfile_unparseable(tmp_path):
+    logfile = tmp_path / "vina.log"
+    logfile.write_text("")
+
+    assert vina.VinaRunner.parse_logfile(logfile) is None
+    assert vina.VinaRunner.parse_logfile(tmp_path / "missing.log") is None
+
+
+def test_parse_outfile(tmp_path):
+    outfile = tmp_path / "vina_out.pdbqt"
+    outfile.write_text(
+        "MODEL 1\n"
+        "REMARK VINA RESULT:    -7.2      0.000      0.000\n"
+        "REMARK  2 active torsions:\n"
+        "ENDMDL\n"
+        "MODEL 2\n"
+        "REMARK VINA RESULT:    -6.9      1.974      2.861\n"
+        "ENDMDL\n"
+        "REMARK VINA RESULT:\n"
+    )
+
+    assert vina.VinaRunner.parse_outfile(outfile) == [-7.2, -6.9]
+
+
+def test_can_run_in_process_default(monkeypatch):
+    monkeypatch.setattr("pyscreener.docking.vina.runner.Vina", object)
+
+    assert not vina.VinaRunner.can_run_in_process(vina.VinaMetadata())
+
+
+def test_can_run_in_process(monkeypatch):
+    monkeypatch.setattr("pyscreener.docking.vina.runner.Vina", object)
+
+    assert vina.VinaRunner.can_run_in_process(vina.VinaMetadata(use_bindings=True))
+
+
+def test_can_run_in_process_no_bindings(monkeypatch):
+    monkeypatch.setattr("pyscreener.docking.vina.runner.Vina", None)
+
+    assert not vina.VinaRunner.can_run_in_process(vina.VinaMetadata(use_bindings=True))
+
+
+@pytest.mark.parametrize("software,extra", [("qvina", ""), ("smina", ""), ("vina", "--seed 42")])
+def test_can_run_in_process_unsupported(monkeypatch, software, extra):
+    monkeypatch.setattr("pyscreener.docking.vina.runner.Vina", object)
+    metadata = vina.VinaMetadata(software=software, extra=extra, use_bindings=True)
+
+    assert not vina.VinaRunner.can_run_in_process(metadata)
+
+
+def test_validate_metadata_no_prepare_receptor(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda cmd: None)
+
+    with pytest.raises(MissingExecutableError):
+        vina.VinaRunner.validate_metadata(vina.VinaMetadata())
+
+
+def test_run_in_process_reseeds(monkeypatch, tmp_path):
+    seeds = []
+
+    class FakeVina:
+        def __init__(self, sf_name="vina", cpu=0, seed=0, verbosity=1):
+            seeds.append(seed)
+
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: None
+
+        def energies(self, *args, **kwargs):
+            return np.array([[-7.2, 0.0]])
+
+    monkeypatch.setattr("pyscreener.docking.vina.runner.Vina", FakeVina)
+    ligand = tmp_path / "ligand.pdbqt"
+    ligand.write_text("ROOT\nENDROOT\n")
+
+    for _ in range(2):
+        scores = vina.VinaRunner.run_in_process(ligand, "receptor.pdbqt", (0, 0, 0), path=tmp_path)
+        assert scores == [-7.2]
+
+    assert len(seeds) == 2
+    assert seeds[0] != seeds[1]